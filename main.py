@@ -5,28 +5,41 @@ File Eraser Tool - Securely erases files by overwriting content in multiple step
 import os
 import sys
 import json
-import random
 import string
 import logging
+import logging.handlers
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QTextEdit, QTabWidget, QLabel, QProgressBar,
     QFileDialog, QMessageBox
 )
-from PyQt6.QtCore import QThread, pyqtSignal, Qt
+from PyQt6.QtCore import QThread, QTimer, pyqtSignal, Qt
 
 
 # Setup logging
 LOG_FILE = Path(__file__).parent / "eraser.log"
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+_log_file_handler = logging.FileHandler(LOG_FILE, delay=True)
+_log_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+# File records are buffered and written in batches; warnings and errors flush immediately
+LOG_BUFFER = logging.handlers.MemoryHandler(
+    capacity=1024,
+    flushLevel=logging.WARNING,
+    target=_log_file_handler
+)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
-        logging.FileHandler(LOG_FILE),
+        LOG_BUFFER,
         logging.StreamHandler()
     ]
 )
@@ -38,6 +51,28 @@ DEFAULT_CONFIG = {
     "files_to_erase": []
 }
 
+# Maps every byte value to an ASCII letter, so random bytes become random letters via bytes.translate
+_LETTER_TABLE = bytes(ord(string.ascii_letters[i % len(string.ascii_letters)]) for i in range(256))
+
+# Overwrite passes stream data in chunks of this size so memory use does not grow with the file
+CHUNK_SIZE = 1 << 20
+
+# Step 3 pattern, built once; its length is a whole number of repeats so chunks join seamlessly
+_HELLO_PATTERN = b"hello world "
+_HELLO_CHUNK = _HELLO_PATTERN * (CHUNK_SIZE // len(_HELLO_PATTERN))
+
+# Number of files erased concurrently; independent files can keep the disk queue busy
+MAX_ERASE_THREADS = 8
+
+# Minimum seconds between progress bar updates sent from the worker
+PROGRESS_EMIT_INTERVAL = 0.05
+# How often buffered log lines are appended to the log display, in milliseconds
+LOG_FLUSH_INTERVAL_MS = 100
+# Maximum number of log lines kept while the log display is hidden
+LOG_BUFFER_MAX_LINES = 10000
+# Delay used to coalesce config edits from the buttons into one save, in milliseconds
+CONFIG_SAVE_DELAY_MS = 250
+
 
 def load_config() -> dict:
     """Load configuration from JSON file."""
@@ -46,141 +81,229 @@ def load_config() -> dict:
             with open(CONFIG_FILE, 'r') as f:
                 return json.load(f)
         except Exception as e:
-            logger.error(f"Error loading config: {e}")
+            logger.error("Error loading config: %s", e)
     return DEFAULT_CONFIG.copy()
 
 
 def save_config(config: dict):
     """Save configuration to JSON file."""
+    # Write to a temporary file and swap it in so a crash never leaves a half-written config
+    tmp_file = CONFIG_FILE.with_suffix('.tmp')
     try:
-        with open(CONFIG_FILE, 'w') as f:
+        with open(tmp_file, 'w') as f:
             json.dump(config, f, indent=2)
+            # The data must be on disk before the rename, or a power loss can leave an empty config
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, CONFIG_FILE)
         logger.info("Config saved successfully")
     except Exception as e:
-        logger.error(f"Error saving config: {e}")
+        logger.error("Error saving config: %s", e)
+        try:
+            os.unlink(tmp_file)
+        except OSError:
+            pass
 
 
-def get_all_files(paths: List[str]) -> List[Path]:
-    """Get all files from the given paths (files and folders)."""
-    all_files = []
+def _iter_files(paths: List[str]) -> Iterator[str]:
+    """Yield every file under the given paths (files and folders), each only once."""
+    # Overlapping entries (a file inside a listed folder, nested folders) must not be erased twice
+    seen = set()
+
+    def is_new(file_path: str) -> bool:
+        key = os.path.normcase(os.path.abspath(file_path))
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
     for path_str in paths:
-        path = Path(path_str)
-        logger.info(f"Processing path: {path_str}")
-        if path.is_file():
-            logger.info(f"  -> Is a file, adding directly")
-            all_files.append(path)
-        elif path.is_dir():
-            logger.info(f"  -> Is a directory, scanning recursively...")
-            count_before = len(all_files)
-            for file_path in path.rglob('*'):
-                if file_path.is_file():
-                    all_files.append(file_path)
-            logger.info(f"  -> Found {len(all_files) - count_before} files in {path_str}")
+        logger.info("Processing path: %s", path_str)
+        if os.path.isfile(path_str):
+            logger.info("  -> Is a file, adding directly")
+            if is_new(path_str):
+                yield path_str
+        elif os.path.isdir(path_str):
+            logger.info("  -> Is a directory, scanning recursively...")
+            found = 0
+            # Walk with scandir so file/dir checks use the directory entry type instead of a stat per entry
+            pending_dirs = deque([path_str])
+            while pending_dirs:
+                dir_path = pending_dirs.pop()
+                try:
+                    with os.scandir(dir_path) as entries:
+                        for entry in entries:
+                            if entry.is_file(follow_symlinks=False):
+                                if not is_new(entry.path):
+                                    continue
+                                found += 1
+                                yield entry.path
+                            elif entry.is_dir(follow_symlinks=False):
+                                pending_dirs.append(entry.path)
+                except OSError as e:
+                    logger.warning("  -> Cannot scan %s: %s", dir_path, e)
+            logger.info("  -> Found %d files in %s", found, path_str)
         else:
-            logger.warning(f"  -> Path does not exist or is not accessible: {path_str}")
-    logger.info(f"Total files to process: {len(all_files)}")
+            logger.warning("  -> Path does not exist or is not accessible: %s", path_str)
+
+
+def get_all_files(paths: List[str]) -> List[str]:
+    """Get all files from the given paths (files and folders)."""
+    all_files = list(_iter_files(paths))
+    logger.info("Total files to process: %d", len(all_files))
     return all_files
 
 
-def erase_file(file_path: Path, progress_callback=None) -> bool:
+def _write_all(fd: int, data) -> None:
+    """Write all of data to fd, retrying after short writes."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _write_repeated(fd: int, chunk: bytes, size: int):
+    """Write size bytes to fd by repeating chunk, ending with a partial chunk if needed."""
+    if size <= 0:
+        return
+    full_chunks, tail = divmod(size, len(chunk))
+    for _ in range(full_chunks):
+        _write_all(fd, chunk)
+    if tail:
+        _write_all(fd, memoryview(chunk)[:tail])
+
+
+def _drop_page_cache(fd: int):
+    """Tell the kernel the pages just written to fd will not be read back (no-op where unsupported)."""
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+# fdatasync skips the metadata-only flush of fsync; Windows only has fsync
+_datasync = getattr(os, 'fdatasync', os.fsync)
+
+
+def _overwrite(fd: int, chunk: bytes, size: int):
+    """Overwrite the first size bytes of the file behind fd in place with chunk repeated and sync it."""
+    os.lseek(fd, 0, os.SEEK_SET)
+    _write_repeated(fd, chunk, size)
+    # The pass must reach the disk before the next step replaces it
+    _datasync(fd)
+    # Pages are clean after the sync, so the kernel can actually drop them
+    _drop_page_cache(fd)
+
+
+def erase_file(file_path: str, progress_callback=None) -> bool:
     """
     Securely erase a file by overwriting its content in multiple steps.
     Returns True if successful, False otherwise.
     """
     try:
-        if not file_path.exists():
-            logger.warning(f"File not found: {file_path}")
+        # All four steps share one descriptor; raw fd writes skip the BufferedWriter copy.
+        # Steps 2-4 each sync before the next step so every pass is persisted.
+        try:
+            fd = os.open(file_path, os.O_WRONLY | getattr(os, 'O_BINARY', 0))
+        except FileNotFoundError:
+            logger.warning("File not found: %s", file_path)
             return False
-
-        # Read original content
-        with open(file_path, 'rb') as f:
-            original_content = f.read()
-        
-        original_size = len(original_content)
-        if original_size == 0:
-            logger.info(f"File is empty, skipping: {file_path}")
-            return True
-
-        # Step 1: Remove 10% of the content
-        if progress_callback:
-            progress_callback(f"Step 1/4: Removing 10% of content from {file_path.name}")
-        new_size = int(original_size * 0.9)
-        with open(file_path, 'wb') as f:
-            f.write(original_content[:new_size])
-            f.flush()
-            os.fsync(f.fileno())
-        logger.info(f"Step 1 complete: Removed 10% from {file_path}")
-
-        # Step 2: Replace remaining bytes with random letters
-        if progress_callback:
-            progress_callback(f"Step 2/4: Replacing with random letters in {file_path.name}")
-        random_letters = ''.join(random.choices(string.ascii_letters, k=new_size)).encode()
-        with open(file_path, 'wb') as f:
-            f.write(random_letters)
-            f.flush()
-            os.fsync(f.fileno())
-        logger.info(f"Step 2 complete: Replaced with random letters in {file_path}")
-
-        # Step 3: Overwrite with "hello world" repeated
-        if progress_callback:
-            progress_callback(f"Step 3/4: Overwriting with 'hello world' in {file_path.name}")
-        hello_data = (b"hello world " * (new_size // 12 + 1))[:new_size]
-        with open(file_path, 'wb') as f:
-            f.write(hello_data)
-            f.flush()
-            os.fsync(f.fileno())
-        logger.info(f"Step 3 complete: Overwrote with 'hello world' in {file_path}")
-
-        # Step 4: Overwrite with empty content
-        if progress_callback:
-            progress_callback(f"Step 4/4: Clearing content of {file_path.name}")
-        with open(file_path, 'wb') as f:
-            f.write(b'')
-            f.flush()
-            os.fsync(f.fileno())
-        logger.info(f"Step 4 complete: Cleared content of {file_path}")
-
-        logger.info(f"Successfully erased: {file_path}")
+        try:
+            # Only the size matters; the original content is never read
+            original_size = os.fstat(fd).st_size
+            file_name = os.path.basename(file_path)
+            if original_size == 0:
+                logger.debug("File is empty, skipping: %s", file_path)
+                return True
+            new_size = int(original_size * 0.9)
+
+            # Step 1: Remove 10% of the content
+            if progress_callback:
+                progress_callback(f"Step 1/4: Removing 10% of content from {file_name}")
+            os.ftruncate(fd, new_size)
+            logger.debug("Step 1 complete: Removed 10%% from %s", file_path)
+
+            # Step 2: Replace remaining bytes with random letters
+            if progress_callback:
+                progress_callback(f"Step 2/4: Replacing with random letters in {file_name}")
+            # os.urandom keeps no shared generator state, so pool threads never contend on an RNG
+            random_letters = os.urandom(min(CHUNK_SIZE, new_size)).translate(_LETTER_TABLE)
+            _overwrite(fd, random_letters, new_size)
+            logger.debug("Step 2 complete: Replaced with random letters in %s", file_path)
+
+            # Step 3: Overwrite with "hello world" repeated
+            if progress_callback:
+                progress_callback(f"Step 3/4: Overwriting with 'hello world' in {file_name}")
+            _overwrite(fd, _HELLO_CHUNK, new_size)
+            logger.debug("Step 3 complete: Overwrote with 'hello world' in %s", file_path)
+
+            # Step 4: Overwrite with empty content
+            if progress_callback:
+                progress_callback(f"Step 4/4: Clearing content of {file_name}")
+            os.ftruncate(fd, 0)
+            _datasync(fd)
+        finally:
+            os.close(fd)
+        logger.debug("Step 4 complete: Cleared content of %s", file_path)
+
+        logger.info("Successfully erased: %s", file_path)
         return True
 
     except Exception as e:
-        logger.error(f"Error erasing {file_path}: {e}")
+        logger.error("Error erasing %s: %s", file_path, e)
         return False
 
 
 class EraseWorker(QThread):
     """Worker thread for erasing files."""
     progress = pyqtSignal(str)
+    file_done = pyqtSignal(int, bool)  # index into files, success
     file_progress = pyqtSignal(int, int)  # current, total
     finished_signal = pyqtSignal(int, int)  # success_count, fail_count
     
-    def __init__(self, files: List[Path]):
+    def __init__(self, files: List[str]):
         super().__init__()
         self.files = files
-        self.is_running = True
+        self._stop_event = threading.Event()
     
     def run(self):
         success_count = 0
         fail_count = 0
         total = len(self.files)
-        
-        for i, file_path in enumerate(self.files):
-            if not self.is_running:
-                self.progress.emit("Erasing stopped by user")
-                break
-
-            self.file_progress.emit(i + 1, total)
-            self.progress.emit(f"Processing file {i + 1}/{total}: {file_path.name}")
-
-            if erase_file(file_path, self.progress.emit):
-                success_count += 1
-            else:
-                fail_count += 1
-
+        completed = 0
+        last_emit = 0.0
+
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_ERASE_THREADS, total))) as executor:
+            futures = {executor.submit(self._erase_one, file_path): i for i, file_path in enumerate(self.files)}
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
+                    continue
+                completed += 1
+                # One message per file; the progress bar is throttled but always shows the last file
+                now = time.monotonic()
+                if now - last_emit >= PROGRESS_EMIT_INTERVAL or completed == total:
+                    self.file_progress.emit(completed, total)
+                    last_emit = now
+                if result:
+                    success_count += 1
+                else:
+                    fail_count += 1
+                # Send the index only; the GUI turns it into text when the line is displayed
+                self.file_done.emit(futures[future], result)
+
+        if self._stop_event.is_set():
+            self.file_progress.emit(completed, total)
+            self.progress.emit("Erasing stopped by user")
+
+        LOG_BUFFER.flush()
         self.finished_signal.emit(success_count, fail_count)
 
+    def _erase_one(self, file_path: str):
+        """Erase a single file on a pool thread. Returns None if skipped because of a stop request."""
+        if self._stop_event.is_set():
+            return None
+        return erase_file(file_path)
+
     def stop(self):
-        self.is_running = False
+        self._stop_event.set()
 
 
 class FileEraserApp(QMainWindow):
@@ -194,7 +317,23 @@ class FileEraserApp(QMainWindow):
         self.config = load_config()
         self.worker = None
 
+        # Log entries are collected here and rendered into the display in batches while it is visible.
+        # Each entry is (time, message, paths, index, success); file results leave message as None
+        # and are formatted from paths[index] only when shown.
+        self._log_buffer = deque(maxlen=LOG_BUFFER_MAX_LINES)
+        self._log_timer = QTimer(self)
+        self._log_timer.setInterval(LOG_FLUSH_INTERVAL_MS)
+        self._log_timer.timeout.connect(self.flush_log)
+
+        # Button edits mark the config dirty; the timer writes it once things settle
+        self._config_dirty = False
+        self._config_save_timer = QTimer(self)
+        self._config_save_timer.setSingleShot(True)
+        self._config_save_timer.setInterval(CONFIG_SAVE_DELAY_MS)
+        self._config_save_timer.timeout.connect(self.flush_config)
+
         self.setup_ui()
+        self._log_timer.start()
 
     def setup_ui(self):
         """Setup the user interface."""
@@ -207,7 +346,7 @@ class FileEraserApp(QMainWindow):
         layout.addWidget(self.tabs)
 
         # Tab 1: Eraser
-        eraser_tab = QWidget()
+        self.eraser_tab = eraser_tab = QWidget()
         eraser_layout = QVBoxLayout(eraser_tab)
 
         # Buttons row
@@ -274,18 +413,35 @@ class FileEraserApp(QMainWindow):
         config_layout.addWidget(save_config_btn)
 
         self.tabs.addTab(config_tab, "⚙️ Config")
+        # Render anything queued while the Config tab was shown as soon as the Eraser tab returns
+        self.tabs.currentChanged.connect(lambda _index: self.flush_log())
 
     def log(self, message: str):
-        """Add message to log display."""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_display.append(f"[{timestamp}] {message}")
+        """Queue message for the log display."""
+        self._log_buffer.append((datetime.now(), message, None, 0, True))
+
+    def on_file_done(self, index: int, success: bool):
+        """Queue the result of one erased file for the log display."""
+        self._log_buffer.append((datetime.now(), None, self.worker.files, index, success))
+
+    def flush_log(self):
+        """Render queued messages into the log display in one update, if it is on screen."""
+        if not self._log_buffer or self.tabs.currentWidget() is not self.eraser_tab or self.isMinimized():
+            return
+        lines = []
+        for when, message, paths, index, success in self._log_buffer:
+            if message is None:
+                message = f"{'Done' if success else 'Failed'}: {os.path.basename(paths[index])}"
+            lines.append(f"[{when.strftime('%H:%M:%S')}] {message}")
+        self.log_display.append("\n".join(lines))
+        self._log_buffer.clear()
 
     def add_files(self):
         """Add files to the erase list."""
         files, _ = QFileDialog.getOpenFileNames(self, "Select Files to Erase")
         if files:
-            self.config["files_to_erase"].extend(files)
-            save_config(self.config)
+            self.config["files_to_erase"] = sorted(set(self.config["files_to_erase"]) | set(files))
+            self.schedule_config_save()
             self.update_config_editor()
             self.log(f"Added {len(files)} file(s) to erase list")
 
@@ -293,8 +449,8 @@ class FileEraserApp(QMainWindow):
         """Add folder to the erase list."""
         folder = QFileDialog.getExistingDirectory(self, "Select Folder to Erase")
         if folder:
-            self.config["folders_to_erase"].append(folder)
-            save_config(self.config)
+            self.config["folders_to_erase"] = sorted(set(self.config["folders_to_erase"]) | {folder})
+            self.schedule_config_save()
             self.update_config_editor()
             self.log(f"Added folder: {folder}")
 
@@ -302,10 +458,22 @@ class FileEraserApp(QMainWindow):
         """Clear the erase list."""
         self.config["files_to_erase"] = []
         self.config["folders_to_erase"] = []
-        save_config(self.config)
+        self.schedule_config_save()
         self.update_config_editor()
         self.log("Cleared erase list")
 
+    def schedule_config_save(self):
+        """Mark the config as changed and save it after a short delay."""
+        self._config_dirty = True
+        self._config_save_timer.start()
+
+    def flush_config(self):
+        """Write pending config changes to disk now."""
+        self._config_save_timer.stop()
+        if self._config_dirty:
+            save_config(self.config)
+            self._config_dirty = False
+
     def update_config_editor(self):
         """Update config editor with current config."""
         self.config_editor.setPlainText(json.dumps(self.config, indent=2))
@@ -314,7 +482,8 @@ class FileEraserApp(QMainWindow):
         """Save config from editor text."""
         try:
             self.config = json.loads(self.config_editor.toPlainText())
-            save_config(self.config)
+            self._config_dirty = True
+            self.flush_config()
             self.log("Config saved successfully")
         except json.JSONDecodeError as e:
             QMessageBox.warning(self, "Invalid JSON", f"Config is not valid JSON: {e}")
@@ -322,6 +491,7 @@ class FileEraserApp(QMainWindow):
     def start_erasing(self):
         """Start the erasing process."""
         # Reload config from disk to pick up any manual edits
+        self.flush_config()
         self.config = load_config()
         self.update_config_editor()
 
@@ -352,9 +522,12 @@ class FileEraserApp(QMainWindow):
         self.progress_bar.setValue(0)
 
         self.worker = EraseWorker(files)
-        self.worker.progress.connect(self.log)
-        self.worker.file_progress.connect(self.update_progress)
-        self.worker.finished_signal.connect(self.on_erase_finished)
+        # Explicitly queued: the worker and its pool threads only post events to the GUI thread
+        queued = Qt.ConnectionType.QueuedConnection
+        self.worker.progress.connect(self.log, queued)
+        self.worker.file_done.connect(self.on_file_done, queued)
+        self.worker.file_progress.connect(self.update_progress, queued)
+        self.worker.finished_signal.connect(self.on_erase_finished, queued)
         self.worker.start()
 
     def stop_erasing(self):
@@ -375,8 +548,14 @@ class FileEraserApp(QMainWindow):
         self.progress_bar.setVisible(False)
         self.status_label.setText("Ready")
         self.log(f"Erase complete: {success} succeeded, {fail} failed")
+        self.flush_log()
         QMessageBox.information(self, "Complete", f"Erasing complete!\n\nSuccess: {success}\nFailed: {fail}")
 
+    def closeEvent(self, event):
+        """Save any pending config changes before closing."""
+        self.flush_config()
+        super().closeEvent(event)
+
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)